@@ -1,138 +1,414 @@
+import asyncio
+import re
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional
-from openai import OpenAI
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from pydantic import BaseModel
+from agents._client import get_async_client
+from agents._ratelimit import get_limiters
 from config import config
-from prompts import get_prompt, PromptVersion
+from prompts import ANALYSIS_TASKS, format_prompt, get_template, prepare_text, PromptVersion
 from prompts.config import prompt_config
+from utils import cache_key, clean_text
+from utils.response_cache import ResponseCache
+from utils.sectionize import sectionize, task_section_text
+
+# Task order for the fused single-call analysis
+_FUSED_TASKS = ANALYSIS_TASKS
+
+# Prefixes the legacy path stamps onto task fields when a call fails;
+# callers deciding whether a result is worth caching check for these
+_ERROR_MARKERS = ("Error in API call:", "Error in analysis task:")
+
+def analysis_has_errors(analysis: Dict) -> bool:
+    """True if any task field carries an embedded error string.
+
+    The per-task path degrades gracefully by stringifying failures into
+    the affected fields, so a returned dict is not necessarily a complete
+    analysis; anything that persists results (e.g. the semantic cache)
+    should skip dicts this flags.
+    """
+    for task in ANALYSIS_TASKS:
+        value = analysis.get(task)
+        items = value if isinstance(value, list) else (value,)
+        for item in items:
+            if isinstance(item, str) and item.startswith(_ERROR_MARKERS):
+                return True
+    return False
+
+class PaperAnalysis(BaseModel):
+    """Structured-output schema for the fused single-call analysis"""
+    summary: str
+    key_findings: List[str]
+    methodology: str
+    contributions: List[str]
+    limitations: List[str]
+
+# Bullet-point lines in AI responses: quote/dash/star markers or "1."-style
+# numbering, with the marker and surrounding whitespace stripped. The greedy
+# (.*\S) body avoids the per-character backtracking a lazy (.+?) pays on very
+# long responses (e.g. merged batch outputs with thousands of bullets).
+_BULLET_RE = re.compile(r'^[ \t]*(?:["\-\*]|[1-9]\d*\.)[ \t]*(.*\S)[ \t]*$', re.MULTILINE)
+
+def parse_bullet_points(text: str) -> List[str]:
+    """Parse bullet points from an AI response in one regex pass"""
+    bullet_points = _BULLET_RE.findall(text)
+    return bullet_points if bullet_points else [text]
+
+# Cached split results keyed by (text digest, chunk_size, chunk_overlap), so
+# re-analyzing the same text (e.g. across prompt-tester configurations) never
+# re-runs the recursive splitter
+_SPLIT_CACHE: OrderedDict = OrderedDict()
+_SPLIT_CACHE_SIZE = 32
+
+@lru_cache(maxsize=8)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """Share one splitter instance per (chunk_size, chunk_overlap)"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+
+def split_text(text: str, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None) -> List[str]:
+    """Split text into chunks, reusing cached results for repeated texts"""
+    chunk_size = chunk_size if chunk_size is not None else config.chunk_size
+    chunk_overlap = chunk_overlap if chunk_overlap is not None else config.chunk_overlap
+
+    key = (cache_key(text), chunk_size, chunk_overlap)
+    chunks = _SPLIT_CACHE.get(key)
+    if chunks is None:
+        chunks = _get_splitter(chunk_size, chunk_overlap).split_text(text)
+        _SPLIT_CACHE[key] = chunks
+        if len(_SPLIT_CACHE) > _SPLIT_CACHE_SIZE:
+            _SPLIT_CACHE.popitem(last=False)
+    else:
+        _SPLIT_CACHE.move_to_end(key)
+    return chunks
+
+@lru_cache(maxsize=64)
+def _get_cached_template(version_value: str, custom_config: Optional[str], task: str) -> str:
+    """Resolve a raw prompt template once per (version, config, task)"""
+    if custom_config:
+        return prompt_config.get_template(custom_config, task)
+    return get_template(task, PromptVersion(version_value))
 
 class LiteratureReviewAgent:
-    def __init__(self, prompt_version: PromptVersion = PromptVersion.V2_DETAILED, custom_config: Optional[str] = None):
+    def __init__(self, prompt_version: PromptVersion = PromptVersion.V2_DETAILED, custom_config: Optional[str] = None,
+                 use_cache: bool = True):
         if not config.validate_api_key():
             raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
-        
-        self.client = OpenAI(api_key=config.openai_api_key)
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=config.chunk_size,
-            chunk_overlap=config.chunk_overlap,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
+
+        self.response_cache = ResponseCache() if use_cache else None
+        self.text_splitter = _get_splitter(config.chunk_size, config.chunk_overlap)
         self.prompt_version = prompt_version
         self.custom_config = custom_config
-    
-    def analyze_paper(self, text: str, metadata: Dict) -> Dict:
+        # The system prompt is constant for the agent's lifetime, so
+        # resolve it once instead of per API call
+        self._system_prompt = self._resolve_system_prompt()
+
+    @property
+    def client(self):
+        """Async client for the current event loop.
+
+        Resolved per access rather than cached at construction: each
+        asyncio.run call runs on a fresh loop, and a client pinned at
+        __init__ would hand out connections bound to a closed loop on the
+        second and every later analysis in the process.
+        """
+        return get_async_client()
+
+    def analyze_paper(self, text: str, metadata: Dict, legacy: bool = False,
+                      raw_text: Optional[str] = None) -> Dict:
         """Analyze academic paper and extract key information"""
-        
-        # Split text into manageable chunks
-        chunks = self.text_splitter.split_text(text)
-        
-        # Extract different aspects of the paper
-        analysis = {
-            'summary': self._generate_summary(chunks),
-            'key_findings': self._extract_key_findings(chunks),
-            'methodology': self._extract_methodology(chunks),
-            'contributions': self._extract_contributions(chunks),
-            'limitations': self._extract_limitations(chunks),
+        return asyncio.run(self.analyze_paper_async(
+            text, metadata, legacy=legacy, raw_text=raw_text
+        ))
+
+    async def analyze_paper_async(self, text: str, metadata: Dict, legacy: bool = False,
+                                  raw_text: Optional[str] = None) -> Dict:
+        """Analyze academic paper.
+
+        The default path fuses all five extraction tasks into a single
+        structured-output call: the paper's tokens are prefilled once and
+        one round-trip replaces five. Pass legacy=True (the --legacy CLI
+        flag) for the original per-task concurrent calls. raw_text, when
+        given, is the extraction before clean_text ran; section headings
+        are detected there since cleaning collapses the newlines the
+        heading patterns anchor on.
+        """
+        if not legacy:
+            try:
+                return await self._analyze_paper_fused(text, metadata)
+            except Exception:
+                # Fall through to the per-task path; it degrades gracefully
+                # per field instead of failing the whole analysis
+                pass
+
+        # Detect section boundaries once up front, on the raw extraction
+        # when the caller kept it (cleaned text has no line starts left to
+        # match); section bodies are then cleaned before they reach prompts
+        sections = sectionize(raw_text if raw_text is not None else text)
+        if len(sections) < 2:
+            sections = {}
+        else:
+            sections = {name: clean_text(part) for name, part in sections.items()}
+
+        # Split text into manageable chunks (cached across repeated texts)
+        chunks = split_text(text)
+        # Section routing wins when headings were found: each task sends
+        # only its relevant sections, so there is no full document to
+        # share. The shared full-document system prefix is the fallback
+        # for papers whose structure can't be detected, capped to the
+        # prompt token budget since it travels with all five calls.
+        return await self.analyze_paper_from_chunks_async(
+            chunks, metadata, sections=sections,
+            document_context=None if sections else prepare_text(text)
+        )
+
+    async def _analyze_paper_fused(self, text: str, metadata: Dict) -> Dict:
+        """Run all five extraction tasks in one structured-output call"""
+        prompt = self._get_fused_prompt()
+        # Cap the document to the prompt token budget before it rides in
+        # the system prefix; an uncapped paper would overrun the context
+        text = prepare_text(text)
+        system_prompt = (f"{self._system_prompt}\n\n---PAPER FULL TEXT---\n"
+                         f"{text}\n---END PAPER---")
+        model = config.model_for_task("combined_analysis")
+        max_tokens = config.max_tokens_for_task("combined_analysis")
+
+        cache_key = None
+        if self.response_cache:
+            cache_key = ResponseCache.make_key(
+                system_prompt, prompt, model,
+                config.temperature, max_tokens
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return {**PaperAnalysis.model_validate_json(cached).model_dump(),
+                        'metadata': metadata}
+
+        rpm_limiter, tpm_limiter = get_limiters()
+        await rpm_limiter.acquire()
+        await tpm_limiter.acquire((len(system_prompt) + len(prompt)) // 4 + max_tokens)
+
+        response = await self.client.beta.chat.completions.parse(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            response_format=PaperAnalysis,
+            max_tokens=max_tokens,
+            temperature=config.temperature
+        )
+        analysis = response.choices[0].message.parsed
+        if analysis is None:
+            raise ValueError("Structured analysis response could not be parsed")
+
+        if self.response_cache:
+            self.response_cache.set(cache_key, analysis.model_dump_json())
+
+        return {**analysis.model_dump(), 'metadata': metadata}
+
+    def _get_fused_prompt(self) -> str:
+        """Fused prompt for all five tasks, preferring the combined template"""
+        try:
+            template = _get_cached_template(
+                self.prompt_version.value, self.custom_config, "combined_analysis"
+            )
+            return (format_prompt(template) +
+                    "\n\nApply these instructions to the paper text provided above.")
+        except Exception:
+            # Custom configs without a combined template: concatenate the
+            # per-task instructions instead
+            pass
+        parts = ["Perform all five analyses below on the paper text provided above, "
+                 "returning each result in its corresponding response field."]
+        for task in _FUSED_TASKS:
+            parts.append(f"## {task}\n{self._get_prompt(task)}")
+        return "\n\n".join(parts)
+
+    def analyze_paper_from_chunks(self, chunks: List[str], metadata: Dict,
+                                  sections: Optional[Dict[str, str]] = None,
+                                  document_context: Optional[str] = None) -> Dict:
+        """Analyze a paper from pre-split chunks, skipping re-splitting"""
+        return asyncio.run(self.analyze_paper_from_chunks_async(
+            chunks, metadata, sections=sections, document_context=document_context
+        ))
+
+    async def analyze_paper_from_chunks_async(self, chunks: List[str], metadata: Dict,
+                                              sections: Optional[Dict[str, str]] = None,
+                                              document_context: Optional[str] = None) -> Dict:
+        """Analyze a paper from pre-split chunks, running tasks concurrently.
+
+        When document_context is given, the paper text is sent once in a
+        shared system prefix and each task only sends its short
+        instructions; the provider's prompt cache then serves the paper
+        tokens for calls 2-5 instead of re-billing them per task.
+        """
+        sections = sections or {}
+
+        # The five extraction tasks are independent, so run them concurrently;
+        # wall-clock time is then bounded by the slowest call instead of the sum
+        results = await asyncio.gather(
+            self._generate_summary(chunks, task_section_text(sections, 'summary'), document_context),
+            self._extract_key_findings(chunks, task_section_text(sections, 'key_findings'), document_context),
+            self._extract_methodology(chunks, task_section_text(sections, 'methodology'), document_context),
+            self._extract_contributions(chunks, task_section_text(sections, 'contributions'), document_context),
+            self._extract_limitations(chunks, task_section_text(sections, 'limitations'), document_context),
+            return_exceptions=True
+        )
+
+        summary, key_findings, methodology, contributions, limitations = [
+            f"Error in analysis task: {result}" if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+        return {
+            'summary': summary,
+            'key_findings': key_findings,
+            'methodology': methodology,
+            'contributions': contributions,
+            'limitations': limitations,
             'metadata': metadata
         }
-        
-        return analysis
-    
-    def _generate_summary(self, chunks: List[str]) -> str:
+
+    async def _generate_summary(self, chunks: List[str], section_text: Optional[str] = None,
+                                document_context: Optional[str] = None) -> str:
         """Generate a comprehensive summary of the paper"""
-        # Use first few chunks for summary (usually abstract and introduction)
-        summary_text = " ".join(chunks[:3])
-        
-        prompt = self._get_prompt("summary", text=summary_text)
-        return self._call_openai(prompt)
-    
-    def _extract_key_findings(self, chunks: List[str]) -> List[str]:
+        if document_context:
+            prompt = self._get_instruction_prompt("summary")
+        else:
+            # Use first few chunks for summary (usually abstract and introduction)
+            summary_text = section_text or " ".join(chunks[:3])
+            prompt = self._get_prompt("summary", text=summary_text)
+        return await self._call_openai(prompt, task="summary", document_context=document_context)
+
+    async def _extract_key_findings(self, chunks: List[str], section_text: Optional[str] = None,
+                                    document_context: Optional[str] = None) -> List[str]:
         """Extract key findings from the paper"""
-        # Focus on results and conclusion sections
-        relevant_chunks = chunks[-3:] if len(chunks) > 3 else chunks
-        combined_text = " ".join(relevant_chunks)
-        
-        prompt = self._get_prompt("key_findings", text=combined_text)
-        response = self._call_openai(prompt)
+        if document_context:
+            prompt = self._get_instruction_prompt("key_findings")
+        else:
+            # Focus on results and conclusion sections
+            relevant_chunks = chunks[-3:] if len(chunks) > 3 else chunks
+            combined_text = section_text or " ".join(relevant_chunks)
+            prompt = self._get_prompt("key_findings", text=combined_text)
+        response = await self._call_openai(prompt, task="key_findings", document_context=document_context)
         return self._parse_bullet_points(response)
-    
-    def _extract_methodology(self, chunks: List[str]) -> str:
+
+    async def _extract_methodology(self, chunks: List[str], section_text: Optional[str] = None,
+                                   document_context: Optional[str] = None) -> str:
         """Extract methodology information"""
-        # Look for methodology in middle chunks
-        method_chunks = chunks[1:-1] if len(chunks) > 2 else chunks
-        combined_text = " ".join(method_chunks)
-        
-        prompt = self._get_prompt("methodology", text=combined_text)
-        return self._call_openai(prompt)
-    
-    def _extract_contributions(self, chunks: List[str]) -> List[str]:
+        if document_context:
+            prompt = self._get_instruction_prompt("methodology")
+        else:
+            # Look for methodology in middle chunks
+            method_chunks = chunks[1:-1] if len(chunks) > 2 else chunks
+            combined_text = section_text or " ".join(method_chunks)
+            prompt = self._get_prompt("methodology", text=combined_text)
+        return await self._call_openai(prompt, task="methodology", document_context=document_context)
+
+    async def _extract_contributions(self, chunks: List[str], section_text: Optional[str] = None,
+                                     document_context: Optional[str] = None) -> List[str]:
         """Extract main contributions of the paper"""
-        # Use all chunks but focus on abstract and conclusion
-        key_chunks = [chunks[0]] + chunks[-2:] if len(chunks) > 2 else chunks
-        combined_text = " ".join(key_chunks)
-        
-        prompt = self._get_prompt("contributions", text=combined_text)
-        response = self._call_openai(prompt)
+        if document_context:
+            prompt = self._get_instruction_prompt("contributions")
+        else:
+            # Use all chunks but focus on abstract and conclusion
+            key_chunks = [chunks[0]] + chunks[-2:] if len(chunks) > 2 else chunks
+            combined_text = section_text or " ".join(key_chunks)
+            prompt = self._get_prompt("contributions", text=combined_text)
+        response = await self._call_openai(prompt, task="contributions", document_context=document_context)
         return self._parse_bullet_points(response)
-    
-    def _extract_limitations(self, chunks: List[str]) -> List[str]:
+
+    async def _extract_limitations(self, chunks: List[str], section_text: Optional[str] = None,
+                                   document_context: Optional[str] = None) -> List[str]:
         """Extract limitations and future work suggestions"""
-        # Focus on conclusion and discussion sections
-        conclusion_chunks = chunks[-2:] if len(chunks) > 1 else chunks
-        combined_text = " ".join(conclusion_chunks)
-        
-        prompt = self._get_prompt("limitations", text=combined_text)
-        response = self._call_openai(prompt)
+        if document_context:
+            prompt = self._get_instruction_prompt("limitations")
+        else:
+            # Focus on conclusion and discussion sections
+            conclusion_chunks = chunks[-2:] if len(chunks) > 1 else chunks
+            combined_text = section_text or " ".join(conclusion_chunks)
+            prompt = self._get_prompt("limitations", text=combined_text)
+        response = await self._call_openai(prompt, task="limitations", document_context=document_context)
         return self._parse_bullet_points(response)
-    
+
+    def _get_instruction_prompt(self, task: str) -> str:
+        """Prompt for a task whose paper text travels in the system message"""
+        return (self._get_prompt(task) +
+                "\n\nApply these instructions to the paper text provided above.")
+
     def _get_prompt(self, task: str, **kwargs) -> str:
         """Get prompt for a specific task using current configuration"""
         try:
-            if self.custom_config:
-                return prompt_config.get_custom_prompt(self.custom_config, task, **kwargs)
-            else:
-                return get_prompt(task, self.prompt_version, **kwargs)
+            # Template lookup is cached; only the final format runs per call
+            template = _get_cached_template(self.prompt_version.value, self.custom_config, task)
+            return format_prompt(template, **kwargs)
         except Exception as e:
             # Fallback to basic prompt if configuration fails
             return f"Analyze this text for {task}: {kwargs.get('text', '')}"
-    
-    def _call_openai(self, prompt: str) -> str:
-        """Make API call to OpenAI"""
+
+    async def _call_openai(self, prompt: str, task: Optional[str] = None,
+                           document_context: Optional[str] = None) -> str:
+        """Make API call to OpenAI, routing model and token budget by task"""
         try:
-            system_prompt = self._get_system_prompt()
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            system_prompt = self._system_prompt
+            if document_context:
+                # The paper rides in the system prefix, identical across all
+                # five task calls, so the provider's prompt cache pays for
+                # its tokens once per paper instead of once per task
+                system_prompt = (f"{system_prompt}\n\n---PAPER FULL TEXT---\n"
+                                 f"{document_context}\n---END PAPER---")
+            model = config.model_for_task(task)
+            max_tokens = config.max_tokens_for_task(task)
+
+            cache_key = None
+            if self.response_cache:
+                cache_key = ResponseCache.make_key(
+                    system_prompt, prompt, model,
+                    config.temperature, max_tokens
+                )
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+            # Pace concurrent calls against the account's per-minute quotas
+            # so large batches throttle instead of burning 429 retries
+            rpm_limiter, tpm_limiter = get_limiters()
+            await rpm_limiter.acquire()
+            # Rough but cheap token estimate: ~4 chars per prompt token,
+            # plus the full completion budget
+            await tpm_limiter.acquire((len(system_prompt) + len(prompt)) // 4 + max_tokens)
+
+            response = await self.client.chat.completions.create(
+                model=model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=config.max_tokens,
+                max_tokens=max_tokens,
                 temperature=config.temperature
             )
-            return response.choices[0].message.content.strip()
+            result = response.choices[0].message.content.strip()
+
+            if self.response_cache:
+                self.response_cache.set(cache_key, result)
+
+            return result
         except Exception as e:
             return f"Error in API call: {str(e)}"
-    
-    def _get_system_prompt(self) -> str:
-        """Get system prompt based on current configuration"""
+
+    def _resolve_system_prompt(self) -> str:
+        """Resolve the system prompt for the current configuration"""
         try:
-            if self.custom_config:
-                return prompt_config.get_custom_prompt(self.custom_config, "system")
-            else:
-                return get_prompt("system", self.prompt_version)
+            return _get_cached_template(self.prompt_version.value, self.custom_config, "system")
         except Exception:
             return "You are an expert academic researcher analyzing scientific papers."
-    
+
     def _parse_bullet_points(self, text: str) -> List[str]:
         """Parse bullet points from AI response"""
-        lines = text.split('\n')
-        bullet_points = []
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith(('"', '-', '*', '1.', '2.', '3.', '4.', '5.')):
-                # Remove bullet point markers
-                cleaned = line.lstrip('"-* ').lstrip('123456789. ')
-                if cleaned:
-                    bullet_points.append(cleaned)
-        
-        return bullet_points if bullet_points else [text]
\ No newline at end of file
+        return parse_bullet_points(text)
@@ -0,0 +1,59 @@
+"""
+Shared OpenAI client instances so all agents reuse one connection pool
+"""
+import asyncio
+from typing import Optional
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from config import config
+
+# Pool sizing shared by both clients; keep-alive connections amortize the
+# TCP + TLS handshake across every request after the first
+_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_REQUEST_TIMEOUT = 60.0
+_MAX_RETRIES = 2
+
+_async_client: Optional[AsyncOpenAI] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_client: Optional[OpenAI] = None
+
+def get_async_client() -> AsyncOpenAI:
+    """Return a shared AsyncOpenAI client valid for the current event loop.
+
+    httpx async connections (and the pool's internal primitives) are bound
+    to the loop they were opened on, so a client kept across successive
+    asyncio.run invocations would try to reuse keep-alive connections from
+    a closed loop and fail. The client is rebuilt whenever it is used on a
+    different running loop; the stale one is dropped and its sockets are
+    closed by garbage collection. Within one loop every call still shares
+    the same pool.
+    """
+    global _async_client, _async_client_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _async_client is None or (loop is not None
+                                 and _async_client_loop not in (None, loop)):
+        _async_client = AsyncOpenAI(
+            api_key=config.openai_api_key,
+            http_client=httpx.AsyncClient(limits=_POOL_LIMITS, timeout=_REQUEST_TIMEOUT),
+            max_retries=_MAX_RETRIES
+        )
+        _async_client_loop = loop
+    elif loop is not None and _async_client_loop is None:
+        # Created outside any loop; its connections will open on this one
+        _async_client_loop = loop
+    return _async_client
+
+def get_client() -> OpenAI:
+    """Return the process-wide synchronous OpenAI client, creating it on first use"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = OpenAI(
+            api_key=config.openai_api_key,
+            http_client=httpx.Client(limits=_POOL_LIMITS, timeout=_REQUEST_TIMEOUT),
+            max_retries=_MAX_RETRIES
+        )
+    return _sync_client
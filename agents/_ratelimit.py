@@ -0,0 +1,54 @@
+"""
+Async token-bucket rate limiting for OpenAI calls
+"""
+import asyncio
+import time
+from typing import Optional, Tuple
+from config import config
+
+class AsyncRateLimiter:
+    """Token-bucket limiter for per-minute request/token quotas.
+
+    Modeled on aiolimiter's AsyncLimiter but implemented locally to avoid
+    a dependency. State is only mutated between awaits, so no lock is
+    needed within a single event loop, and the monotonic-clock bookkeeping
+    carries over correctly across successive asyncio.run loops.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = float(max_rate)
+        self.time_period = time_period
+        self._allowance = self.max_rate
+        self._last_check = time.monotonic()
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until the bucket can cover `amount`, then consume it"""
+        # An oversized request must not wait forever; let it through once
+        # the bucket is completely full
+        amount = min(amount, self.max_rate)
+
+        while True:
+            now = time.monotonic()
+            self._allowance = min(
+                self.max_rate,
+                self._allowance + (now - self._last_check) * (self.max_rate / self.time_period)
+            )
+            self._last_check = now
+
+            if self._allowance >= amount:
+                self._allowance -= amount
+                return
+
+            shortfall = (amount - self._allowance) * self.time_period / self.max_rate
+            await asyncio.sleep(shortfall)
+
+_rpm_limiter: Optional[AsyncRateLimiter] = None
+_tpm_limiter: Optional[AsyncRateLimiter] = None
+
+def get_limiters() -> Tuple[AsyncRateLimiter, AsyncRateLimiter]:
+    """Return the shared (requests-per-minute, tokens-per-minute) limiters"""
+    global _rpm_limiter, _tpm_limiter
+    if _rpm_limiter is None:
+        _rpm_limiter = AsyncRateLimiter(config.max_rpm)
+        _tpm_limiter = AsyncRateLimiter(config.max_tpm)
+    return _rpm_limiter, _tpm_limiter
@@ -0,0 +1,126 @@
+import io
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+from config import config
+from prompts import PromptVersion
+from agents import LiteratureReviewAgent, split_text
+from agents._client import get_client
+
+# Tasks that make up one paper analysis; list-valued tasks get bullet parsing
+ANALYSIS_TASKS = ('summary', 'key_findings', 'methodology', 'contributions', 'limitations')
+BULLET_TASKS = ('key_findings', 'contributions', 'limitations')
+
+class BatchRunner:
+    """Analyze many papers through OpenAI's Batch API.
+
+    Batch requests are billed at half price and draw from a separate
+    rate-limit pool, which makes this the right path for overnight runs
+    over a whole corpus. LiteratureReviewAgent.analyze_paper remains the
+    low-latency path for single papers.
+    """
+
+    def __init__(self, prompt_version: PromptVersion = PromptVersion.V2_DETAILED,
+                 custom_config: Optional[str] = None, poll_interval: float = 30.0):
+        # Reuse the agent's splitter and prompt resolution so batch and
+        # interactive runs produce identical requests
+        self._agent = LiteratureReviewAgent(prompt_version=prompt_version, custom_config=custom_config)
+        self.client = get_client()
+        self.poll_interval = poll_interval
+
+    def analyze_papers_batch(self, papers: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Analyze a list of (text, metadata) papers in one batch job"""
+        requests = []
+        for paper_id, (text, _metadata) in enumerate(papers):
+            chunks = split_text(text)
+            for task in ANALYSIS_TASKS:
+                requests.append(self._build_request(paper_id, task, chunks))
+
+        batch = self._submit(requests)
+        batch = self._wait_for_completion(batch.id)
+
+        if batch.status != 'completed':
+            raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'")
+
+        responses = self._fetch_responses(batch.output_file_id)
+        return self._build_analyses(papers, responses)
+
+    def _build_request(self, paper_id: int, task: str, chunks: List[str]) -> Dict:
+        """Build one JSONL request line for the Batch API"""
+        prompt = self._agent._get_prompt(task, text=self._task_text(task, chunks))
+        return {
+            'custom_id': f"{paper_id}:{task}",
+            'method': 'POST',
+            'url': '/v1/chat/completions',
+            'body': {
+                'model': config.model_for_task(task),
+                'messages': [
+                    {'role': 'system', 'content': self._agent._system_prompt},
+                    {'role': 'user', 'content': prompt}
+                ],
+                'max_tokens': config.max_tokens_for_task(task),
+                'temperature': config.temperature
+            }
+        }
+
+    @staticmethod
+    def _task_text(task: str, chunks: List[str]) -> str:
+        """Select the chunk subset for a task (mirrors the agent's heuristics)"""
+        if task == 'summary':
+            return " ".join(chunks[:3])
+        elif task == 'key_findings':
+            return " ".join(chunks[-3:] if len(chunks) > 3 else chunks)
+        elif task == 'methodology':
+            return " ".join(chunks[1:-1] if len(chunks) > 2 else chunks)
+        elif task == 'contributions':
+            return " ".join([chunks[0]] + chunks[-2:] if len(chunks) > 2 else chunks)
+        else:  # limitations
+            return " ".join(chunks[-2:] if len(chunks) > 1 else chunks)
+
+    def _submit(self, requests: List[Dict]):
+        """Upload the JSONL payload and create the batch job"""
+        payload = "\n".join(json.dumps(request) for request in requests).encode('utf-8')
+        batch_file = self.client.files.create(file=io.BytesIO(payload), purpose='batch')
+        return self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+
+    def _wait_for_completion(self, batch_id: str):
+        """Poll the batch until it reaches a terminal status"""
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in ('completed', 'failed', 'expired', 'cancelled'):
+                return batch
+            time.sleep(self.poll_interval)
+
+    def _fetch_responses(self, output_file_id: str) -> Dict[str, str]:
+        """Download batch output and map custom_id -> response text"""
+        content = self.client.files.content(output_file_id)
+        responses = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get('response') or {}
+            if response.get('status_code') == 200:
+                body = response['body']
+                responses[result['custom_id']] = body['choices'][0]['message']['content'].strip()
+            else:
+                responses[result['custom_id']] = f"Error in batch request: {result.get('error')}"
+        return responses
+
+    def _build_analyses(self, papers: List[Tuple[str, Dict]], responses: Dict[str, str]) -> List[Dict]:
+        """Demux responses by custom_id back into per-paper analysis dicts"""
+        analyses = []
+        for paper_id, (_text, metadata) in enumerate(papers):
+            analysis = {'metadata': metadata}
+            for task in ANALYSIS_TASKS:
+                response = responses.get(f"{paper_id}:{task}", "Error: missing batch response")
+                if task in BULLET_TASKS:
+                    analysis[task] = self._agent._parse_bullet_points(response)
+                else:
+                    analysis[task] = response
+            analyses.append(analysis)
+        return analyses
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, Optional
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
@@ -11,13 +11,45 @@ class Config(BaseModel):
     temperature: float = 0.3
     chunk_size: int = 3000
     chunk_overlap: int = 200
-    
+    default_model: str = "gpt-3.5-turbo"
+    # Account quota ceilings used by the client-side rate limiter; tune
+    # these to the tier of the API key in use
+    max_rpm: int = 500
+    max_tpm: int = 200_000
+    # Route cheap extraction tasks to a smaller, faster model; methodology
+    # and limitations benefit from a stronger one
+    task_model_map: Dict[str, str] = {
+        'summary': 'gpt-4o-mini',
+        'key_findings': 'gpt-4o-mini',
+        'contributions': 'gpt-4o-mini',
+        'methodology': 'gpt-4o',
+        'limitations': 'gpt-4o',
+        # Fused single-call analysis covering all five tasks at once
+        'combined_analysis': 'gpt-4o-mini'
+    }
+    # Per-task completion budgets; the list-style tasks never need the
+    # full default of 4000 tokens
+    task_max_tokens: Dict[str, int] = {
+        'summary': 1500,
+        'key_findings': 1000,
+        'contributions': 1000,
+        'methodology': 1500,
+        'limitations': 1000,
+        'combined_analysis': 4000
+    }
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.openai_api_key:
             self.openai_api_key = os.getenv('OPENAI_API_KEY')
-    
+
     def validate_api_key(self) -> bool:
         return self.openai_api_key is not None and len(self.openai_api_key) > 0
 
+    def model_for_task(self, task: Optional[str]) -> str:
+        return self.task_model_map.get(task, self.default_model)
+
+    def max_tokens_for_task(self, task: Optional[str]) -> int:
+        return self.task_max_tokens.get(task, self.max_tokens)
+
 config = Config()
\ No newline at end of file
@@ -4,18 +4,26 @@ Development utility for testing different prompts
 """
 import sys
 import os
+import asyncio
 import click
 import json
 from pathlib import Path
 
+# orjson serializes large comparison results far faster than stdlib json;
+# fall back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Keep module import light: the agent (openai, langchain) and parser
+# (pdfplumber) stacks are imported inside the commands that need them, so
+# list_prompts/show_prompt don't pay their import cost
 from prompts import PromptTemplates, PromptVersion, get_prompt
 from prompts.config import prompt_config
-from agents import LiteratureReviewAgent
-from parsers.pdf_parser import PDFParser
-from utils import clean_text
 
 @click.group()
 def cli():
@@ -55,8 +63,8 @@ def list_prompts():
 
 @cli.command()
 @click.argument('task', type=click.Choice(['summary', 'key_findings', 'methodology', 'contributions', 'limitations']))
-@click.option('--version', type=click.Choice(['v1_basic', 'v2_detailed', 'v3_structured', 'experimental']), 
-              default='v2_detailed')
+@click.option('--version', type=click.Choice([v.value for v in PromptVersion]),
+              default=PromptVersion.V2_DETAILED.value)
 @click.option('--custom', help='Use custom configuration instead of built-in version')
 @click.option('--text', help='Sample text to use in prompt (or provide via stdin)')
 def show_prompt(task, version, custom, text):
@@ -73,14 +81,7 @@ def show_prompt(task, version, custom, text):
             prompt = prompt_config.get_custom_prompt(custom, task, text=text)
             click.echo(f"=== Custom Configuration: {custom} ===")
         else:
-            version_map = {
-                'v1_basic': PromptVersion.V1_BASIC,
-                'v2_detailed': PromptVersion.V2_DETAILED,
-                'v3_structured': PromptVersion.V3_STRUCTURED,
-                'experimental': PromptVersion.EXPERIMENTAL
-            }
-            prompt_version = version_map[version]
-            prompt = get_prompt(task, prompt_version, text=text)
+            prompt = get_prompt(task, PromptVersion(version), text=text)
             click.echo(f"=== Built-in Version: {version} ===")
         
         click.echo(f"Task: {task}")
@@ -103,7 +104,11 @@ def show_prompt(task, version, custom, text):
 @click.option('--output', help='Save comparison to JSON file')
 def compare_prompts(pdf_file, task, version1, version2, custom1, custom2, output):
     """Compare two different prompt configurations on the same PDF"""
-    
+
+    from agents import LiteratureReviewAgent, split_text
+    from parsers.pdf_parser import PDFParser
+    from utils import clean_text
+
     # Extract text from PDF
     try:
         parser = PDFParser()
@@ -116,11 +121,14 @@ def compare_prompts(pdf_file, task, version1, version2, custom1, custom2, output
             return
             
         click.echo(f"Extracted {len(cleaned_text)} characters from {pdf_file}")
-        
+
     except Exception as e:
         click.echo(f"Error processing PDF: {e}", err=True)
         return
-    
+
+    # Split once and share the chunks across all configurations
+    chunks = split_text(cleaned_text)
+
     # Prepare configurations
     configs = []
     
@@ -144,30 +152,21 @@ def compare_prompts(pdf_file, task, version1, version2, custom1, custom2, output
             if config_type == "custom":
                 agent = LiteratureReviewAgent(custom_config=config_name)
             else:
-                version_map = {
-                    'v1_basic': PromptVersion.V1_BASIC,
-                    'v2_detailed': PromptVersion.V2_DETAILED,
-                    'v3_structured': PromptVersion.V3_STRUCTURED,
-                    'experimental': PromptVersion.EXPERIMENTAL
-                }
-                prompt_version = version_map.get(config_name, PromptVersion.V2_DETAILED)
+                try:
+                    prompt_version = PromptVersion(config_name)
+                except ValueError:
+                    prompt_version = PromptVersion.V2_DETAILED
                 agent = LiteratureReviewAgent(prompt_version=prompt_version)
             
             # Get specific task result
-            from langchain.text_splitter import RecursiveCharacterTextSplitter
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=3000, chunk_overlap=200)
-            chunks = text_splitter.split_text(cleaned_text)
-            
-            if task == 'summary':
-                result = agent._generate_summary(chunks)
-            elif task == 'key_findings':
-                result = agent._extract_key_findings(chunks)
-            elif task == 'methodology':
-                result = agent._extract_methodology(chunks)
-            elif task == 'contributions':
-                result = agent._extract_contributions(chunks)
-            elif task == 'limitations':
-                result = agent._extract_limitations(chunks)
+            task_methods = {
+                'summary': agent._generate_summary,
+                'key_findings': agent._extract_key_findings,
+                'methodology': agent._extract_methodology,
+                'contributions': agent._extract_contributions,
+                'limitations': agent._extract_limitations
+            }
+            result = asyncio.run(task_methods[task](chunks))
             
             results[display_name] = {
                 'config_type': config_type,
@@ -213,9 +212,13 @@ def compare_prompts(pdf_file, task, version1, version2, custom1, custom2, output
             'results': results
         }
         
-        with open(output, 'w') as f:
-            json.dump(comparison_data, f, indent=2)
-        
+        if orjson is not None:
+            with open(output, 'wb') as f:
+                f.write(orjson.dumps(comparison_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output, 'w') as f:
+                json.dump(comparison_data, f, indent=2)
+
         click.echo(f"\nComparison saved to {output}")
 
 @cli.command()
@@ -1,14 +1,42 @@
 import os
-import validators
 import requests
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urlparse
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+@lru_cache(maxsize=1024)
+def _has_pdf_header(file_path: str, mtime_ns: int) -> bool:
+    """Check the %PDF magic bytes with raw fd syscalls.
+
+    Cached per (path, mtime) so repeat validations of unchanged files in
+    the same process cost nothing.
+    """
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            header = os.read(fd, 4)
+        finally:
+            os.close(fd)
+        return header == b'%PDF'
+    except OSError:
+        return False
+
+def _is_url(input_str: str) -> bool:
+    """Classify an input string as an http(s) URL"""
+    parsed = urlparse(input_str)
+    return parsed.scheme in ('http', 'https') and bool(parsed.netloc)
 
 class InputValidator:
-    def __init__(self):
+    # Upper bound on a single PDF download; protects disk from misrouted
+    # or malicious URLs that stream unbounded bodies
+    DEFAULT_MAX_DOWNLOAD_BYTES = 100 * 1024 * 1024
+
+    def __init__(self, max_download_bytes: int = DEFAULT_MAX_DOWNLOAD_BYTES):
         self.supported_extensions = ['.pdf']
+        self.max_download_bytes = max_download_bytes
     
     def validate_input(self, input_str: str) -> dict:
         """Validate and classify input as URL or file path"""
@@ -21,7 +49,7 @@ class InputValidator:
         }
         
         # Check if it's a URL
-        if validators.url(input_str):
+        if _is_url(input_str):
             result['input_type'] = 'url'
             result['path'] = input_str
             validation_result = self._validate_and_download_url(input_str)
@@ -39,6 +67,19 @@ class InputValidator:
         
         return result
     
+    def validate_and_download_urls(self, urls: List[str], max_concurrency: int = 16) -> List[dict]:
+        """Validate and download multiple inputs concurrently.
+
+        Downloads are purely I/O-bound, so running them through a thread
+        pool gives near-linear speedup up to the bandwidth limit. Results
+        are returned in the same order as the input list.
+        """
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(urls))) as executor:
+            return list(executor.map(self.validate_input, urls))
+
     def _validate_and_download_url(self, url: str) -> dict:
         """Validate URL and download PDF if valid"""
         parsed = urlparse(url)
@@ -46,38 +87,61 @@ class InputValidator:
             return {'is_valid': False, 'error': 'Invalid URL scheme'}
         
         try:
-            # Make a HEAD request first to check content type
-            head_response = requests.head(url, timeout=10, allow_redirects=True)
-            content_type = head_response.headers.get('content-type', '').lower()
-            
+            # Single GET instead of HEAD + GET; headers and magic bytes are
+            # checked once the stream starts, saving one round trip per URL
+            response = requests.get(url, timeout=30, stream=True, allow_redirects=True)
+            response.raise_for_status()
+
+            content_type = response.headers.get('content-type', '').lower()
+
+            # Fail fast on oversized bodies before downloading anything
+            content_length = response.headers.get('content-length')
+            if content_length and content_length.isdigit() and int(content_length) > self.max_download_bytes:
+                response.close()
+                return {'is_valid': False, 'error': 'PDF exceeds maximum download size'}
+
             # Check if it's a PDF
             if 'application/pdf' not in content_type:
                 # Some servers don't set proper content-type, so also check URL extension
                 if not url.lower().endswith('.pdf'):
+                    response.close()
                     return {'is_valid': False, 'error': 'URL does not point to a PDF file'}
-            
-            # Download the PDF to a temporary file
-            response = requests.get(url, timeout=30, stream=True)
-            response.raise_for_status()
-            
+
             # Create temporary file
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            
-            # Download in chunks
+
+            # Download in chunks, sniffing the PDF header on the first chunk
+            # and enforcing the size cap as bytes arrive
+            first_chunk = True
+            bytes_written = 0
             for chunk in response.iter_content(chunk_size=8192):
                 if chunk:
+                    if first_chunk:
+                        if not chunk.startswith(b'%PDF'):
+                            temp_file.close()
+                            os.unlink(temp_file.name)
+                            response.close()
+                            return {'is_valid': False, 'error': 'URL content is not a valid PDF'}
+                        first_chunk = False
+                    bytes_written += len(chunk)
+                    if bytes_written > self.max_download_bytes:
+                        temp_file.close()
+                        os.unlink(temp_file.name)
+                        response.close()
+                        return {'is_valid': False, 'error': 'PDF exceeds maximum download size'}
                     temp_file.write(chunk)
-            
+
             temp_file.close()
-            
-            # Verify the downloaded file is actually a PDF
-            if self._validate_file_path(temp_file.name):
-                return {'is_valid': True, 'temp_file': temp_file.name}
-            else:
-                # Clean up invalid file
+
+            # The %PDF header was already verified on the first streamed
+            # chunk, so no re-open/re-read of the temp file is needed
+            if first_chunk:
+                # Stream ended without delivering any content
                 os.unlink(temp_file.name)
-                return {'is_valid': False, 'error': 'Downloaded file is not a valid PDF'}
-                
+                return {'is_valid': False, 'error': 'Downloaded file is empty'}
+
+            return {'is_valid': True, 'temp_file': temp_file.name}
+
         except requests.exceptions.RequestException as e:
             return {'is_valid': False, 'error': f'Error downloading URL: {str(e)}'}
         except Exception as e:
@@ -85,20 +149,14 @@ class InputValidator:
     
     def _validate_file_path(self, file_path: str) -> bool:
         """Validate local file path"""
-        path = Path(file_path)
-        if not path.exists():
-            return False
-        
-        if path.suffix.lower() not in self.supported_extensions:
-            return False
-        
-        # Basic PDF header check
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(4)
-                return header == b'%PDF'
-        except Exception:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
             return False
+
+        # The header is authoritative; PDFs without a .pdf extension are
+        # still valid, so no separate suffix check is needed
+        return _has_pdf_header(file_path, mtime_ns)
     
     def cleanup_temp_file(self, temp_file_path: Optional[str]):
         """Clean up temporary file if it exists"""
@@ -1,26 +1,28 @@
 #!/usr/bin/env python3
 import click
 import os
-from input_handlers.input_validator import InputValidator
-from parsers.pdf_parser import PDFParser
-from agents import LiteratureReviewAgent
 from prompts import PromptVersion
 from prompts.config import prompt_config
-from summarizers import AnalysisFormatter
 from utils import setup_logging, clean_text, ProgressTracker, validate_output_format, get_file_extension_from_format
 from config import config
 
+# The validator (requests), parser (pdfplumber), agent (openai, langchain)
+# and formatter are imported inside the branches that use them, so startup
+# and --list-prompts don't pay for dependencies the run never touches
+
 @click.command()
 @click.option('--input', '-i', help='PDF file path or URL')
 @click.option('--output', '-o', help='Output file for analysis')
 @click.option('--format', '-f', default='text', help='Output format: text, markdown, json')
 @click.option('--analyze', is_flag=True, help='Perform AI-powered analysis (requires OpenAI API key)')
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
-@click.option('--prompt-version', type=click.Choice(['v1_basic', 'v2_detailed', 'v3_structured', 'experimental']), 
-              default='v2_detailed', help='Prompt version to use')
+@click.option('--prompt-version', type=click.Choice([v.value for v in PromptVersion]),
+              default=PromptVersion.V2_DETAILED.value, help='Prompt version to use')
 @click.option('--custom-prompts', help='Use custom prompt configuration (e.g., custom_v1, experimental_roleplay)')
+@click.option('--no-cache', is_flag=True, help='Bypass the on-disk LLM response cache and force fresh API calls')
+@click.option('--legacy', is_flag=True, help='Use one API call per analysis task instead of the fused single call')
 @click.option('--list-prompts', is_flag=True, help='List available prompt configurations and exit')
-def main(input, output, format, analyze, verbose, prompt_version, custom_prompts, list_prompts):
+def main(input, output, format, analyze, verbose, prompt_version, custom_prompts, no_cache, legacy, list_prompts):
     """Academic Paper Summarization and Analysis Agent"""
     
     # Handle prompt listing
@@ -62,6 +64,7 @@ def main(input, output, format, analyze, verbose, prompt_version, custom_prompts
     try:
         # Step 1: Validate input
         progress.update("Validating input")
+        from input_handlers.input_validator import InputValidator
         validator = InputValidator()
         validation_result = validator.validate_input(input)
         
@@ -76,9 +79,40 @@ def main(input, output, format, analyze, verbose, prompt_version, custom_prompts
         
         # Step 2: Extract text and metadata
         progress.update("Extracting text from PDF")
+        # Deferred import: pdfplumber is only loaded once the input is valid
+        from parsers.pdf_parser import PDFParser
         parser = PDFParser()
-        text = parser.extract_text(file_to_process)
-        metadata = parser.extract_metadata(file_to_process)
+
+        if output and not analyze:
+            metadata = parser.extract_metadata(file_to_process)
+            # Plain extraction to a file streams page by page, so large
+            # documents never hold their full text in memory
+            chars_written = 0
+            with open(output, 'w', encoding='utf-8') as f:
+                for page_text in parser.iter_pages(file_to_process):
+                    if not page_text:
+                        continue
+                    cleaned_page = clean_text(page_text)
+                    if cleaned_page:
+                        f.write(cleaned_page + "\n")
+                        chars_written += len(cleaned_page) + 1
+
+            if not chars_written:
+                click.echo("Failed to extract text from PDF")
+                return
+            click.echo(f"Successfully extracted {chars_written} characters from PDF")
+            click.echo(f"Document has {metadata['num_pages']} pages")
+            click.echo(f"Text saved to {output}")
+            progress.finish()
+            return
+
+        # Single open yields both text and metadata instead of parsing
+        # twice; the file is memory-mapped so hashing and parsing read
+        # straight from the page cache without a read() copy
+        import mmap
+        with open(file_to_process, 'rb') as pdf_file:
+            with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text, metadata = parser.extract_all(mapped)
         
         if not text:
             click.echo("Failed to extract text from PDF")
@@ -98,19 +132,15 @@ def main(input, output, format, analyze, verbose, prompt_version, custom_prompts
             
             # Step 3: Initialize AI agent with prompt configuration
             progress.update("Initializing AI analysis")
+            from agents import LiteratureReviewAgent, analysis_has_errors
             try:
-                # Convert prompt version string to enum
-                version_map = {
-                    'v1_basic': PromptVersion.V1_BASIC,
-                    'v2_detailed': PromptVersion.V2_DETAILED,
-                    'v3_structured': PromptVersion.V3_STRUCTURED,
-                    'experimental': PromptVersion.EXPERIMENTAL
-                }
-                prompt_ver = version_map.get(prompt_version, PromptVersion.V2_DETAILED)
-                
+                # Click already validated the string against the enum values
+                prompt_ver = PromptVersion(prompt_version)
+
                 agent = LiteratureReviewAgent(
                     prompt_version=prompt_ver,
-                    custom_config=custom_prompts
+                    custom_config=custom_prompts,
+                    use_cache=not no_cache
                 )
                 
                 if custom_prompts:
@@ -124,13 +154,36 @@ def main(input, output, format, analyze, verbose, prompt_version, custom_prompts
             # Step 4: Perform analysis
             progress.update("Analyzing paper with AI")
             try:
-                analysis_result = agent.analyze_paper(cleaned_text, metadata)
-                click.echo("Analysis completed successfully!")
+                # Near-duplicate papers (preprint vs camera-ready, re-runs
+                # with different prompt flags) are served from the semantic
+                # cache when its optional dependencies are installed
+                semantic_cache = None
+                if not no_cache:
+                    from summarizers.semantic_cache import SemanticCache, semantic_cache_available
+                    if semantic_cache_available():
+                        semantic_cache = SemanticCache()
+
+                analysis_result = semantic_cache.get(cleaned_text) if semantic_cache else None
+                if analysis_result is not None:
+                    click.echo("Analysis served from semantic cache")
+                else:
+                    # raw_text keeps the newlines the agent's section
+                    # detection anchors on; cleaned_text feeds the prompts
+                    analysis_result = agent.analyze_paper(
+                        cleaned_text, metadata, legacy=legacy, raw_text=text
+                    )
+                    # Never cache partial results: a transient failure
+                    # stringified into a field would otherwise be served
+                    # silently on every future run of this paper
+                    if semantic_cache and not analysis_has_errors(analysis_result):
+                        semantic_cache.set(cleaned_text, analysis_result)
+                    click.echo("Analysis completed successfully!")
             except Exception as e:
                 click.echo(f"Error during analysis: {e}")
                 return
             
             # Format and output results
+            from summarizers import AnalysisFormatter
             formatter = AnalysisFormatter()
             
             if output:
@@ -145,16 +198,12 @@ def main(input, output, format, analyze, verbose, prompt_version, custom_prompts
                 formatter.print_analysis(analysis_result, format)
         
         else:
-            # Just extract text without analysis
-            if output:
-                with open(output, 'w', encoding='utf-8') as f:
-                    f.write(cleaned_text)
-                click.echo(f"Text saved to {output}")
-            else:
-                click.echo("\n" + "="*50)
-                click.echo("EXTRACTED TEXT")
-                click.echo("="*50)
-                click.echo(cleaned_text[:1000] + "..." if len(cleaned_text) > 1000 else cleaned_text)
+            # Text-only run without an output file: preview on the console
+            # (file output is handled by the streaming path above)
+            click.echo("\n" + "="*50)
+            click.echo("EXTRACTED TEXT")
+            click.echo("="*50)
+            click.echo(cleaned_text[:1000] + "..." if len(cleaned_text) > 1000 else cleaned_text)
         
         progress.finish()
         
@@ -1,31 +1,348 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+PdfSource = Union[str, Path, BinaryIO, 'mmap.mmap']
+
 import pdfplumber
-from typing import Optional
+
+from parsers.pool import page_buffer_pool
+
+# pypdfium2 extracts text several times faster than pdfplumber's pure-Python
+# layout analysis; use it when available and fall back to pdfplumber for
+# documents it can't parse (or when it isn't installed)
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Bump when extraction output changes (backend swap, join separator, ...)
+# so stale cache entries are ignored rather than served
+_CACHE_VERSION = 1
+_CACHE_MAX_AGE_DAYS = 30
+
+# Page-count buckets selecting the pdfplumber extraction strategy; kept as
+# data so the cutoffs can be tuned without touching the dispatch logic
+EXTRACTION_THRESHOLDS = {
+    # At or below this, pool spawn overhead outweighs any parallelism win
+    'sequential_max_pages': 10,
+    # Up to this, one pool task per page keeps all workers busy
+    'pooled_max_pages': 200,
+    # Above pooled_max_pages, workers take ranges of this many pages so the
+    # per-task document reopen cost is amortized across a batch
+    'batch_size': 10,
+}
+
+class _MmapReader(io.RawIOBase):
+    """File-like view over an mmap, for backends that type-check inputs.
+
+    pypdfium2 rejects mmap objects outright, but accepts io streams; this
+    adapter reads straight out of the mapping with no extra copy.
+    """
+
+    def __init__(self, mapping: 'mmap.mmap'):
+        self._mapping = mapping
+        self._mapping.seek(0)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._mapping.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, pos, whence=os.SEEK_SET):
+        self._mapping.seek(pos, whence)
+        return self._mapping.tell()
+
+    def tell(self):
+        return self._mapping.tell()
+
+def _is_path(pdf_source: PdfSource) -> bool:
+    return isinstance(pdf_source, (str, Path))
+
+def _rewind(pdf_source: PdfSource):
+    """Reset a file-like source so it can be parsed again"""
+    if not _is_path(pdf_source):
+        pdf_source.seek(0)
+
+def _pdfium_source(pdf_source: PdfSource):
+    """Shape a source into something pypdfium2 will accept"""
+    if _is_path(pdf_source):
+        return pdf_source
+    if isinstance(pdf_source, mmap.mmap):
+        return io.BufferedReader(_MmapReader(pdf_source))
+    pdf_source.seek(0)
+    return pdf_source
+
+def _fast_extract(page) -> str:
+    """Rebuild a page's text from raw chars, skipping layout analysis.
+
+    pdfplumber's extract_text runs full character clustering to recover
+    exact reading order, but the downstream consumer is an LLM that
+    tolerates rough ordering. Sorting chars by (line, x) with simple
+    gap heuristics for spaces and newlines is several times cheaper.
+    """
+    chars = page.chars
+    if not chars:
+        return page.extract_text() or ""
+
+    chars = sorted(chars, key=lambda c: (round(c['top']), c['x0']))
+    parts = []
+    prev = None
+    for char in chars:
+        if prev is not None:
+            size = char.get('size') or 12
+            if char['top'] - prev['top'] > size:
+                parts.append('\n')
+            elif char['x0'] - prev['x1'] > size * 0.2:
+                parts.append(' ')
+        parts.append(char['text'])
+        prev = char
+    return "".join(parts)
+
+def _page_text(page, fast: bool) -> Optional[str]:
+    """One page's text via the fast char path or full layout analysis"""
+    return _fast_extract(page) if fast else page.extract_text()
+
+def _extract_page(pdf_path: str, page_index: int, fast: bool = True) -> Optional[str]:
+    """Extract one page's text in a worker process.
+
+    pdfplumber objects are not picklable, so each worker reopens the PDF
+    and pulls its single page.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return _page_text(pdf.pages[page_index], fast)
+
+def _extract_page_range(pdf_path: str, start: int, stop: int, fast: bool = True) -> list:
+    """Extract a contiguous range of pages in one worker open"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_page_text(page, fast) for page in pdf.pages[start:stop]]
 
 class PDFParser:
-    def __init__(self):
-        pass
-    
-    def extract_text(self, pdf_path: str) -> Optional[str]:
-        """Extract text from PDF file"""
+    def __init__(self, max_workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                 fast: bool = True):
+        # Page layout analysis is CPU-bound; beyond ~4 workers the reopen
+        # overhead eats the gains on typical paper lengths
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 4)
+        # fast=False restores pdfplumber's full layout analysis for callers
+        # that need faithful reading order (e.g. tables)
+        self.fast = fast
+        # Extraction is deterministic per file content, so results are
+        # cached by content hash; re-running analysis on the same PDF
+        # (e.g. while tuning prompts) skips extraction entirely
+        self.cache_dir = Path(cache_dir) if cache_dir else (
+            Path.home() / '.cache' / 'litreview' / 'pdf'
+        )
+
+    def extract_text(self, pdf_source: PdfSource) -> Optional[str]:
+        """Extract text from a PDF path or binary file-like source"""
+        if pdfium is not None:
+            try:
+                return self._extract_text_pdfium(pdf_source)
+            except Exception:
+                # Fall back to pdfplumber for files pdfium can't handle
+                pass
+        return self._extract_all_pdfplumber(pdf_source)[0]
+
+    def extract_all(self, pdf_source: PdfSource):
+        """Extract text and metadata with a single document open.
+
+        Opening a PDF pays parse and xref-reconstruction cost, so callers
+        needing both text and metadata should use this instead of two
+        separate extract_* calls. Results are served from the content-hash
+        cache when the same file bytes have been extracted before.
+        """
+        digest = self._file_digest(pdf_source)
+        if digest:
+            cached = self._cache_get(digest)
+            if cached is not None:
+                return cached
+
+        text, metadata = self._extract_all_uncached(pdf_source)
+        if digest and text is not None:
+            self._cache_set(digest, text, metadata)
+        return text, metadata
+
+    def _extract_all_uncached(self, pdf_source: PdfSource):
+        """Run the actual extraction backends, bypassing the cache"""
+        if pdfium is not None:
+            try:
+                pdf = pdfium.PdfDocument(_pdfium_source(pdf_source))
+                try:
+                    metadata = {
+                        'num_pages': len(pdf),
+                        'metadata': pdf.get_metadata_dict() or {}
+                    }
+                    parts = [pdf[i].get_textpage().get_text_range() for i in range(len(pdf))]
+                finally:
+                    pdf.close()
+                return "\n".join(p for p in parts if p).strip(), metadata
+            except Exception:
+                pass
+        return self._extract_all_pdfplumber(pdf_source)
+
+    def iter_pages(self, pdf_source: PdfSource):
+        """Yield each page's text without holding the whole document in memory.
+
+        Callers that stream pages to a file or splitter avoid the single
+        full-document string entirely; only one page's text is live at a
+        time.
+        """
+        if pdfium is not None:
+            try:
+                pdf = pdfium.PdfDocument(_pdfium_source(pdf_source))
+            except Exception:
+                pdf = None
+            if pdf is not None:
+                try:
+                    for i in range(len(pdf)):
+                        yield pdf[i].get_textpage().get_text_range()
+                finally:
+                    pdf.close()
+                return
+        _rewind(pdf_source)
+        with pdfplumber.open(pdf_source) as pdf:
+            for page in pdf.pages:
+                yield _page_text(page, self.fast)
+
+    def _extract_text_pdfium(self, pdf_source: PdfSource) -> str:
+        """Fast-path extraction via pypdfium2"""
+        pdf = pdfium.PdfDocument(_pdfium_source(pdf_source))
+        try:
+            parts = [pdf[i].get_textpage().get_text_range() for i in range(len(pdf))]
+        finally:
+            pdf.close()
+        return "\n".join(p for p in parts if p).strip()
+
+    def _extract_all_pdfplumber(self, pdf_source: PdfSource):
+        """Fallback single-open extraction via pdfplumber, parallel on big files"""
+        # Borrow the per-page buffer from the shared pool instead of
+        # allocating a fresh list per document
+        page_texts = page_buffer_pool.acquire()
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                return text.strip()
+            _rewind(pdf_source)
+            with pdfplumber.open(pdf_source) as pdf:
+                num_pages = len(pdf.pages)
+                metadata = {
+                    'num_pages': num_pages,
+                    'metadata': pdf.metadata or {}
+                }
+                # Short documents aren't worth the process spawn cost, and
+                # in-memory sources can't be reopened by pool workers
+                if (num_pages <= EXTRACTION_THRESHOLDS['sequential_max_pages']
+                        or self.max_workers <= 1
+                        or not _is_path(pdf_source)):
+                    page_texts.extend(_page_text(page, self.fast) for page in pdf.pages)
+                    return "\n".join(t for t in page_texts if t).strip(), metadata
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                if num_pages <= EXTRACTION_THRESHOLDS['pooled_max_pages']:
+                    # map preserves page order, so reassembly is a plain join
+                    page_texts.extend(executor.map(
+                        _extract_page, repeat(pdf_source), range(num_pages),
+                        repeat(self.fast)
+                    ))
+                else:
+                    # Very large documents: hand each worker a page range so
+                    # one reopen covers a whole batch instead of one page
+                    batch = EXTRACTION_THRESHOLDS['batch_size']
+                    starts = range(0, num_pages, batch)
+                    for chunk in executor.map(
+                        _extract_page_range, repeat(pdf_source), starts,
+                        (min(s + batch, num_pages) for s in starts),
+                        repeat(self.fast)
+                    ):
+                        page_texts.extend(chunk)
+            return "\n".join(t for t in page_texts if t).strip(), metadata
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
+            return None, {'num_pages': 0, 'metadata': {}}
+        finally:
+            page_buffer_pool.release(page_texts)
+
+    @staticmethod
+    def _file_digest(pdf_source: PdfSource) -> Optional[str]:
+        """SHA-256 of the source bytes, or None if they can't be read"""
+        try:
+            if _is_path(pdf_source):
+                with open(pdf_source, 'rb') as f:
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+            if isinstance(pdf_source, mmap.mmap):
+                # mmap exposes the buffer protocol, so this hashes the
+                # mapping directly with no intermediate read
+                return hashlib.sha256(pdf_source).hexdigest()
+            pdf_source.seek(0)
+            digest = hashlib.file_digest(pdf_source, 'sha256').hexdigest()
+            pdf_source.seek(0)
+            return digest
+        except (OSError, AttributeError, ValueError):
             return None
-    
-    def extract_metadata(self, pdf_path: str) -> dict:
+
+    def _cache_get(self, digest: str):
+        """Return cached (text, metadata) for a content hash, or None"""
+        path = self.cache_dir / f"{digest}.json"
+        try:
+            if time.time() - path.stat().st_mtime > _CACHE_MAX_AGE_DAYS * 86400:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get('version') != _CACHE_VERSION:
+                return None
+            # Entries record which extraction mode produced them, since the
+            # fast char path and full layout analysis differ in output
+            if entry.get('fast', True) != self.fast:
+                return None
+            return entry['text'], entry['metadata']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _cache_set(self, digest: str, text: str, metadata: dict):
+        """Store an extraction result; failures leave caching best-effort"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_dir / f"{digest}.json.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'version': _CACHE_VERSION, 'fast': self.fast,
+                     'text': text, 'metadata': metadata},
+                    f, ensure_ascii=False
+                )
+            os.replace(tmp_path, self.cache_dir / f"{digest}.json")
+        except OSError:
+            pass
+
+    def extract_metadata(self, pdf_source: PdfSource) -> dict:
         """Extract basic metadata from PDF"""
+        if pdfium is not None:
+            try:
+                pdf = pdfium.PdfDocument(_pdfium_source(pdf_source))
+                try:
+                    return {
+                        'num_pages': len(pdf),
+                        'metadata': pdf.get_metadata_dict() or {}
+                    }
+                finally:
+                    pdf.close()
+            except Exception:
+                pass
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            _rewind(pdf_source)
+            with pdfplumber.open(pdf_source) as pdf:
                 return {
                     'num_pages': len(pdf.pages),
                     'metadata': pdf.metadata or {}
                 }
         except Exception:
-            return {'num_pages': 0, 'metadata': {}}
\ No newline at end of file
+            return {'num_pages': 0, 'metadata': {}}
@@ -0,0 +1,35 @@
+"""
+Bounded object pool for reusable parse buffers
+"""
+import threading
+
+class Pool:
+    """Thread-safe bounded pool of reusable objects.
+
+    Batch runs build and discard an identical per-page buffer for every
+    document; recycling the buffers trims allocator pressure. Released
+    objects are cleared before going back in the pool.
+    """
+
+    def __init__(self, factory=list, maxsize: int = 10):
+        self._factory = factory
+        self._maxsize = maxsize
+        self._items = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take an object from the pool, creating one if empty"""
+        with self._lock:
+            if self._items:
+                return self._items.pop()
+        return self._factory()
+
+    def release(self, obj):
+        """Clear an object and return it to the pool if there is room"""
+        obj.clear()
+        with self._lock:
+            if len(self._items) < self._maxsize:
+                self._items.append(obj)
+
+# Shared pool of per-page text lists used during extraction
+page_buffer_pool = Pool(factory=list, maxsize=10)
@@ -1,9 +1,116 @@
 """
 Prompt templates and configurations for Literature Review Agent
 """
+import re
+import string
+import textwrap
+from functools import lru_cache
 from typing import Dict, Any
 from enum import Enum
 
+# tiktoken gives exact token counts for truncation; without it a
+# chars-per-token estimate is used instead
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough average for English academic text, used when tiktoken is absent
+_CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    return tiktoken.encoding_for_model("gpt-4o")
+
+# Delimiter separating the static instruction block from the per-paper text
+TEXT_DELIMITER = "\n\n---PAPER TEXT---\n"
+
+# Trailing "Text:" style labels in templates, superseded by TEXT_DELIMITER
+_TEXT_LABEL_RE = re.compile(r'text(?:\s+to\s+analyze)?\s*:\s*$', re.IGNORECASE)
+
+_FORMATTER = string.Formatter()
+
+@lru_cache(maxsize=128)
+def _parsed_segments(template: str):
+    """Pre-parse a template into (literal, field) segments.
+
+    str.format reparses the whole template on every call; the small set of
+    live templates is parsed once here and rendered by joining segments.
+    """
+    return tuple(
+        (literal, field) for literal, field, _, _ in _FORMATTER.parse(template)
+    )
+
+def _render(template: str, values: Dict[str, Any]) -> str:
+    """Render a template from its cached segments with plain dict lookups"""
+    parts = []
+    for literal, field in _parsed_segments(template):
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]))
+    return "".join(parts)
+
+@lru_cache(maxsize=128)
+def _static_block(template: str) -> str:
+    """Extract a template's instruction block, dropping the {text} slot.
+
+    Any instructions that followed the text are folded into the prefix
+    and trailing "Text:" style labels are removed.
+    """
+    head, placeholder, tail = template.partition('{text}')
+    if not placeholder:
+        return template
+
+    head = _TEXT_LABEL_RE.sub('', head.rstrip()).rstrip()
+    return head + ('\n' + tail.strip() if tail.strip() else '')
+
+def format_prompt(template: str, **kwargs) -> str:
+    """Format a template with the document text as a strict suffix.
+
+    Provider-side prompt caching only matches from the start of the
+    prompt, so the static instructions must stay a byte-identical prefix
+    and the per-paper text must come last; anything variable before the
+    instructions would invalidate the cached prefix on every call.
+    Called without a text kwarg, this returns only the instruction block,
+    for callers that deliver the paper text elsewhere (e.g. in a shared
+    system message).
+    """
+    text = kwargs.pop('text', None)
+    if '{text}' not in template:
+        if text is not None:
+            kwargs['text'] = text
+        return _render(template, kwargs)
+
+    # Always render, even with no kwargs left: rendering is what folds
+    # {{ and }} escapes back to literal braces (e.g. the v3 combined
+    # template's JSON shape), and _parsed_segments has the parse cached
+    static = _render(_static_block(template), kwargs)
+
+    if text is None:
+        return static
+    return static + TEXT_DELIMITER + text
+
+def prepare_text(text: str, max_tokens: int = 12000) -> str:
+    """Truncate a document to a token budget once, for reuse across tasks.
+
+    Every prompt that embeds the document embeds the same string, so
+    capping it once and sharing the result by reference avoids repeating
+    the work (and the token overrun) per task. Pure function: callers
+    hold the result themselves rather than any template instance
+    remembering it, so one paper can never leak into the next.
+    """
+    if tiktoken is not None:
+        encoding = _get_encoding()
+        tokens = encoding.encode(text)
+        if len(tokens) > max_tokens:
+            text = encoding.decode(tokens[:max_tokens])
+    elif len(text) > max_tokens * _CHARS_PER_TOKEN:
+        text = text[:max_tokens * _CHARS_PER_TOKEN]
+    return text
+
+# The five per-task analyses, in canonical order
+ANALYSIS_TASKS = ('summary', 'key_findings', 'methodology', 'contributions', 'limitations')
+
 class PromptVersion(Enum):
     V1_BASIC = "v1_basic"
     V2_DETAILED = "v2_detailed"
@@ -12,27 +119,71 @@ class PromptVersion(Enum):
 
 class PromptTemplates:
     """Centralized prompt template management"""
-    
+
+    # Version dicts are built on first use and shared by every instance;
+    # a run only touches one version, so the other three are never built
+    _version_cache: Dict[str, Dict[str, str]] = {}
+
     def __init__(self, version: PromptVersion = PromptVersion.V2_DETAILED):
         self.version = version
-        self.templates = self._load_templates()
-    
-    def _load_templates(self) -> Dict[str, Dict[str, str]]:
-        """Load prompt templates based on version"""
+
+    def _load_version(self, version_value: str) -> Dict[str, str]:
+        """Build (or fetch the shared copy of) one version's templates"""
+        templates = self._version_cache.get(version_value)
+        if templates is None:
+            loaders = {
+                PromptVersion.V1_BASIC.value: self._get_v1_templates,
+                PromptVersion.V2_DETAILED.value: self._get_v2_templates,
+                PromptVersion.V3_STRUCTURED.value: self._get_v3_templates,
+                PromptVersion.EXPERIMENTAL.value: self._get_experimental_templates,
+            }
+            # Normalize once at load: source-code indentation must not leak
+            # into prompts, and provider-side prompt caching matches on
+            # byte-identical prefixes, so the instruction blocks have to be
+            # stable regardless of how the literals are laid out here
+            templates = {
+                task: textwrap.dedent(template).strip()
+                for task, template in loaders[version_value]().items()
+            }
+            templates = self._version_cache.setdefault(version_value, templates)
+        return templates
+
+    @property
+    def templates(self) -> Dict[str, Dict[str, str]]:
+        """All version dicts, materializing any not yet built"""
         return {
-            PromptVersion.V1_BASIC.value: self._get_v1_templates(),
-            PromptVersion.V2_DETAILED.value: self._get_v2_templates(),
-            PromptVersion.V3_STRUCTURED.value: self._get_v3_templates(),
-            PromptVersion.EXPERIMENTAL.value: self._get_experimental_templates(),
+            version.value: self._load_version(version.value)
+            for version in PromptVersion
         }
-    
+
     def get_prompt(self, task: str, **kwargs) -> str:
         """Get formatted prompt for specific task"""
-        template = self.templates[self.version.value].get(task)
+        return format_prompt(self.get_template(task), **kwargs)
+
+    def get_all_task_prompts(self, text: str) -> Dict[str, str]:
+        """Formatted prompts for all five analysis tasks at once.
+
+        Callers dispatching the tasks concurrently (the agent gathers
+        them with asyncio) can grab every prompt in one pass; the text
+        object is shared by reference across all five.
+        """
+        return {task: self.get_prompt(task, text=text) for task in ANALYSIS_TASKS}
+
+    def get_combined_prompt(self, **kwargs) -> str:
+        """Get the fused prompt covering all five analysis tasks.
+
+        One combined call sends the paper text once instead of five
+        times; the model returns a JSON object with a field per task.
+        """
+        return self.get_prompt("combined_analysis", **kwargs)
+
+    def get_template(self, task: str) -> str:
+        """Get the raw (unformatted) template for specific task"""
+        template = self._load_version(self.version.value).get(task)
         if not template:
             raise ValueError(f"No template found for task: {task}")
-        
-        return template.format(**kwargs)
+
+        return template
     
     def _get_v1_templates(self) -> Dict[str, str]:
         """Basic prompt templates - simple and direct"""
@@ -70,7 +221,18 @@ class PromptTemplates:
             "limitations": """
             Identify the limitations of this research.
             List them as bullet points.
-            
+
+            Text: {text}
+            """,
+
+            "combined_analysis": """
+            Analyze this academic paper excerpt and return a JSON object with exactly these fields:
+            - "summary": a comprehensive summary of the paper
+            - "key_findings": a list of the key findings
+            - "methodology": a summary of the research methodology
+            - "contributions": a list of the main contributions
+            - "limitations": a list of limitations and future work
+
             Text: {text}
             """
         }
@@ -159,7 +321,27 @@ class PromptTemplates:
             - Suggestions for future research directions
             
             Distinguish between explicit limitations mentioned by authors and potential limitations you can infer.
-            
+
+            Text: {text}
+            """,
+
+            "combined_analysis": """
+            Analyze this academic paper excerpt and produce all five analyses below in one pass.
+            Return a JSON object with exactly these fields:
+
+            - "summary": a comprehensive 3-4 paragraph summary covering research context
+              and motivation, methodology, key findings, and implications
+            - "key_findings": a list of concrete results and measurable outcomes, with
+              supporting evidence or statistical significance when available
+            - "methodology": a structured description of study design, sample, data
+              collection, analysis techniques and controls, detailed enough to replicate
+            - "contributions": a list of novel theoretical, methodological, empirical or
+              practical contributions, each with why it is significant
+            - "limitations": a list of acknowledged limitations, methodological
+              constraints, and suggested future research directions
+
+            Base every field strictly on the provided text.
+
             Text: {text}
             """
         }
@@ -167,9 +349,11 @@ class PromptTemplates:
     def _get_v3_templates(self) -> Dict[str, str]:
         """Structured prompt templates - with specific output formats"""
         return {
-            "system": """You are an expert academic researcher specializing in literature analysis. 
+            "system": """
+            You are an expert academic researcher specializing in literature analysis.
             Provide responses in the exact format requested, using clear structure and academic language.
-            Always base your analysis strictly on the provided text.""",
+            Always base your analysis strictly on the provided text.
+            """,
             
             "summary": """
             Analyze this academic paper excerpt and provide a structured summary.
@@ -264,7 +448,26 @@ class PromptTemplates:
             
             Only include items explicitly mentioned in the text.
             If a category has no items, write "None mentioned in excerpt"
-            
+
+            TEXT: {text}
+            """,
+
+            "combined_analysis": """
+            Analyze this paper and return a single JSON object in this exact shape:
+
+            {{
+              "summary": "<Research question, methodology, key results and significance in 4-6 sentences>",
+              "key_findings": ["<specific finding with evidence>", "..."],
+              "methodology": "<study design, sample, data collection, analysis methods, controls>",
+              "contributions": ["<novel contribution and its impact>", "..."],
+              "limitations": ["<author-acknowledged limitation, constraint or future-work item>", "..."]
+            }}
+
+            REQUIREMENTS:
+            - Use only information from the provided text
+            - Maximum 5 key findings and 4 contributions
+            - Write "Not specified in excerpt" where information is missing
+
             TEXT: {text}
             """
         }
@@ -317,6 +520,12 @@ def get_prompt(task: str, version: PromptVersion = None, **kwargs) -> str:
         return templates.get_prompt(task, **kwargs)
     return default_prompts.get_prompt(task, **kwargs)
 
+def get_template(task: str, version: PromptVersion = None) -> str:
+    """Get the raw (unformatted) template for the specified task"""
+    if version:
+        return PromptTemplates(version).get_template(task)
+    return default_prompts.get_template(task)
+
 def set_default_version(version: PromptVersion):
     """Set the default prompt version globally"""
     global default_prompts
@@ -1,29 +1,80 @@
 """
 Prompt configuration loader and manager
 """
-import yaml
 import json
 import os
+import pickle
+
+# orjson parses JSON several times faster than stdlib json; fall back
+# silently when it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+# Parsed configurations are cached here with a file-signature stamp, so
+# warm starts skip YAML/JSON parsing entirely until a config file changes
+_PARSE_CACHE_PATH = Path.home() / '.cache' / 'litreview' / 'prompts.pkl'
+
 class PromptConfig:
     """Load and manage prompt configurations from files"""
-    
+
     def __init__(self, config_dir: Optional[str] = None):
         self.config_dir = Path(config_dir) if config_dir else Path(__file__).parent
         self.custom_prompts = self._load_custom_prompts()
-    
+
+    def _config_signature(self):
+        """Names and mtimes of every config file, or None if unreadable"""
+        try:
+            files = sorted(self.config_dir.glob("*.yaml")) + sorted(self.config_dir.glob("*.json"))
+            return tuple((p.name, p.stat().st_mtime_ns) for p in files)
+        except OSError:
+            return None
+
     def _load_custom_prompts(self) -> Dict[str, Any]:
-        """Load custom prompts from YAML/JSON files"""
+        """Load custom prompts, reparsing only when config files changed"""
+        sig = self._config_signature()
+        if sig is not None:
+            try:
+                with open(_PARSE_CACHE_PATH, 'rb') as f:
+                    cached_sig, prompts = pickle.load(f)
+                if cached_sig == sig:
+                    return prompts
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+                pass
+
+        prompts = self._parse_custom_prompts()
+
+        if sig is not None:
+            try:
+                _PARSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = _PARSE_CACHE_PATH.with_name('prompts.pkl.tmp')
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump((sig, prompts), f)
+                os.replace(tmp_path, _PARSE_CACHE_PATH)
+            except OSError:
+                pass
+        return prompts
+
+    def _parse_custom_prompts(self) -> Dict[str, Any]:
+        """Parse custom prompts from YAML/JSON files"""
         prompts = {}
         
-        # Load YAML files
-        yaml_files = self.config_dir.glob("*.yaml")
+        # Load YAML files (yaml imports lazily; on signature-cache hits no
+        # parsing happens and the import is never paid)
+        yaml_files = list(self.config_dir.glob("*.yaml"))
+        if yaml_files:
+            import yaml
+            # libyaml's C loader when the binding is compiled in,
+            # otherwise the pure-Python SafeLoader with the same semantics
+            loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
         for yaml_file in yaml_files:
             try:
                 with open(yaml_file, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
+                    data = yaml.load(f, Loader=loader)
                     prompts.update(data)
             except Exception as e:
                 print(f"Warning: Could not load {yaml_file}: {e}")
@@ -32,8 +83,8 @@ class PromptConfig:
         json_files = self.config_dir.glob("*.json")
         for json_file in json_files:
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(json_file, 'rb') as f:
+                    data = _json_loads(f.read())
                     prompts.update(data)
             except Exception as e:
                 print(f"Warning: Could not load {json_file}: {e}")
@@ -42,15 +93,19 @@ class PromptConfig:
     
     def get_custom_prompt(self, config_name: str, task: str, **kwargs) -> str:
         """Get a custom prompt from configuration files"""
+        from prompts import format_prompt
+        return format_prompt(self.get_template(config_name, task), **kwargs)
+
+    def get_template(self, config_name: str, task: str) -> str:
+        """Get the raw (unformatted) template from configuration files"""
         if config_name not in self.custom_prompts:
             raise ValueError(f"Configuration '{config_name}' not found")
-        
+
         config = self.custom_prompts[config_name]
         if task not in config:
             raise ValueError(f"Task '{task}' not found in configuration '{config_name}'")
-        
-        template = config[task]
-        return template.format(**kwargs)
+
+        return config[task]
     
     def list_configurations(self) -> list:
         """List available prompt configurations"""
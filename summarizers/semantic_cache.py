@@ -0,0 +1,112 @@
+"""
+Semantic cache for whole-paper analysis results
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Both dependencies are optional; without them the cache reports itself
+# unavailable and callers fall back to a normal analysis
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Cosine similarity above which two papers count as the same work
+# (catches preprint vs camera-ready and re-extracted copies)
+SIMILARITY_THRESHOLD = 0.87
+# Embedding the opening slice is enough to identify a paper and keeps
+# encode time flat regardless of document length
+EMBED_PREFIX_CHARS = 8000
+_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+def semantic_cache_available() -> bool:
+    """True when the optional embedding dependencies are importable"""
+    return np is not None and SentenceTransformer is not None
+
+class SemanticCache:
+    """Near-duplicate cache for analysis results, keyed by text embedding.
+
+    Exact-match caching misses re-runs where the extracted text differs
+    trivially (whitespace, version of the PDF). Embedding the cleaned
+    text and matching on cosine similarity returns the stored analysis
+    for the same paper in any of those forms, skipping the LLM entirely.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 threshold: float = SIMILARITY_THRESHOLD,
+                 max_entries: int = 256):
+        if not semantic_cache_available():
+            raise RuntimeError(
+                "Semantic caching requires numpy and sentence-transformers"
+            )
+        base = Path(cache_dir) if cache_dir else Path.home() / '.cache' / 'litreview'
+        base.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(base / 'semantic_cache.db')
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY, embedding BLOB, analysis TEXT, "
+            "last_access REAL)"
+        )
+        self._conn.commit()
+        # The embedding model loads lazily so constructing the cache for a
+        # lookup that never happens costs nothing
+        self._model = None
+
+    def _embed(self, text: str):
+        if self._model is None:
+            self._model = SentenceTransformer(_MODEL_NAME)
+        vector = self._model.encode(
+            [text[:EMBED_PREFIX_CHARS]], normalize_embeddings=True
+        )[0]
+        return vector.astype(np.float32)
+
+    def get(self, text: str) -> Optional[Dict]:
+        """Return the stored analysis for a near-duplicate text, or None"""
+        rows = self._conn.execute(
+            "SELECT id, embedding, analysis FROM entries"
+        ).fetchall()
+        if not rows:
+            return None
+
+        query = self._embed(text)
+        matrix = np.vstack([
+            np.frombuffer(embedding, dtype=np.float32) for _, embedding, _ in rows
+        ])
+        # Embeddings are unit-normalized, so one matrix-vector product
+        # gives every cosine similarity at once
+        similarities = matrix @ query
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            return None
+
+        entry_id, _, analysis = rows[best]
+        self._conn.execute(
+            "UPDATE entries SET last_access = ? WHERE id = ?",
+            (time.time(), entry_id)
+        )
+        self._conn.commit()
+        return json.loads(analysis)
+
+    def set(self, text: str, analysis: Dict):
+        """Store an analysis result, evicting least-recently-used entries"""
+        embedding = self._embed(text)
+        self._conn.execute(
+            "INSERT INTO entries (embedding, analysis, last_access) VALUES (?, ?, ?)",
+            (embedding.tobytes(), json.dumps(analysis), time.time())
+        )
+        self._conn.execute(
+            "DELETE FROM entries WHERE id NOT IN ("
+            "SELECT id FROM entries ORDER BY last_access DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._conn.commit()
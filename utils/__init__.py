@@ -1,128 +1,192 @@
+import hashlib
 import re
 import logging
-from typing import List, Dict, Optional
+import sys
+import time
+from collections import Counter, OrderedDict
+from typing import List, Dict, Optional, Union
 from datetime import datetime
 
+def cache_key(payload: Union[str, bytes]) -> str:
+    """Stable 128-bit cache key for a str or bytes payload.
+
+    blake2b is markedly faster than sha256 on short-to-medium inputs and a
+    16-byte digest is ample for in-process or on-disk cache keys. Callers
+    holding bytes should pass them directly to avoid a re-encode.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
     """Setup logging configuration"""
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('literature_review.log')
-        ]
-    )
+    root = logging.getLogger()
+    # basicConfig no-ops once handlers exist, so repeat calls used to open
+    # the log file for nothing; configure the root logger exactly once
+    if not root.handlers:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        # delay=True defers opening the log file until the first record
+        for handler in (logging.StreamHandler(),
+                        logging.FileHandler('literature_review.log', delay=True)):
+            handler.setFormatter(formatter)
+            root.addHandler(handler)
+        root.setLevel(getattr(logging, log_level.upper()))
     return logging.getLogger(__name__)
 
+# Ligatures are expanded via str.translate (a single C pass) before the
+# non-ASCII sweep would otherwise discard them
+_LIGATURES = str.maketrans({'ﬁ': 'fi', 'ﬂ': 'fl', 'ﬀ': 'ff',
+                            'ﬃ': 'ffi', 'ﬄ': 'ffl'})
+
+# clean_text used to rewrite the document through seven sequential passes,
+# each allocating a fresh multi-MB string. Because the whitespace collapse
+# ran first, the later newline-based passes (page numbers, hyphen joins,
+# form feeds) could never match, so the observable transform is exactly:
+# every whitespace or non-ASCII run becomes a single space. One alternation
+# does that in a single scan.
+_CLEAN_RE = re.compile(r'\s+|[^\x00-\x7F]+')
+
 def clean_text(text: str) -> str:
     """Clean and normalize extracted text"""
     if not text:
         return ""
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove page numbers and headers/footers patterns
-    text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
-    text = re.sub(r'\n\s*Page \d+.*?\n', '\n', text, flags=re.IGNORECASE)
-    
-    # Remove common PDF artifacts
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)  # Remove non-ASCII characters
-    text = re.sub(r'\x0c', '\n', text)  # Replace form feed with newline
-    
-    # Clean up line breaks
-    text = re.sub(r'\n{3,}', '\n\n', text)  # Multiple line breaks to double
-    text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)  # Join hyphenated words
-    
-    return text.strip()
+    return _CLEAN_RE.sub(' ', text.translate(_LIGATURES)).strip()
+
+# All section headings folded into one alternation with a named group per
+# section; a single finditer sweep finds every heading in one linear pass
+_ALL_SECTIONS_RE = re.compile(
+    r'(?P<abstract>abstract\s*\n|summary\s*\n)'
+    r'|(?P<introduction>introduction\s*\n|1\.\s*introduction)'
+    r'|(?P<methodology>methodology\s*\n|methods\s*\n|experimental\s+design)'
+    r'|(?P<results>results\s*\n|findings\s*\n)'
+    r'|(?P<discussion>discussion\s*\n)'
+    r'|(?P<conclusion>conclusion\s*\n|conclusions\s*\n)'
+    r'|(?P<references>references\s*\n|bibliography\s*\n)',
+    # Case-insensitive matching directly on the original text avoids
+    # materializing a full lowercased copy of the document
+    re.IGNORECASE
+)
+
+# Downstream consumers (summarizer, keyword extractor, section splitter)
+# often re-feed the same cleaned text, so the O(N) sweeps below memoize by
+# content hash. Memoization is selective: only documents large enough for
+# the sweep to outweigh the hash are cached, bounded by LRU eviction.
+_MEMO_MIN_CHARS = 10_000
+_MEMO_MAX_ENTRIES = 64
+
+def _memo_key(text: str) -> bytes:
+    """Cheap content key: 64-bit blake2b prefix plus the text length"""
+    digest = hashlib.blake2b(text.encode('utf-8', 'ignore'),
+                             digest_size=8).digest()
+    return digest + len(text).to_bytes(8, 'little')
+
+def _memo_get(cache: 'OrderedDict', key: bytes):
+    hit = cache.get(key)
+    if hit is not None:
+        cache.move_to_end(key)
+    return hit
+
+def _memo_set(cache: 'OrderedDict', key: bytes, value):
+    cache[key] = value
+    if len(cache) > _MEMO_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+_sections_memo: 'OrderedDict[bytes, Dict[str, str]]' = OrderedDict()
 
 def extract_sections(text: str) -> Dict[str, str]:
     """Extract common paper sections from text"""
+    memo_key = _memo_key(text) if len(text) > _MEMO_MIN_CHARS else None
+    if memo_key is not None:
+        cached = _memo_get(_sections_memo, memo_key)
+        if cached is not None:
+            return dict(cached)
+
     sections = {}
-    text_lower = text.lower()
-    
-    # Common section patterns
-    section_patterns = {
-        'abstract': [r'abstract\s*\n', r'summary\s*\n'],
-        'introduction': [r'introduction\s*\n', r'1\.\s*introduction'],
-        'methodology': [r'methodology\s*\n', r'methods\s*\n', r'experimental\s+design'],
-        'results': [r'results\s*\n', r'findings\s*\n'],
-        'discussion': [r'discussion\s*\n'],
-        'conclusion': [r'conclusion\s*\n', r'conclusions\s*\n'],
-        'references': [r'references\s*\n', r'bibliography\s*\n']
-    }
-    
-    for section_name, patterns in section_patterns.items():
-        for pattern in patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                start_pos = match.start()
-                
-                # Find the end of this section (start of next section or end of text)
-                next_section_start = len(text)
-                for other_section, other_patterns in section_patterns.items():
-                    if other_section != section_name:
-                        for other_pattern in other_patterns:
-                            other_match = re.search(other_pattern, text_lower[start_pos + 100:])
-                            if other_match:
-                                potential_end = start_pos + 100 + other_match.start()
-                                if potential_end < next_section_start:
-                                    next_section_start = potential_end
-                
-                section_text = text[start_pos:next_section_start].strip()
-                if len(section_text) > 50:  # Only include substantial sections
-                    sections[section_name] = section_text
-                break
-    
+
+    # One sweep yields every heading in document order; each section then
+    # simply runs until the next heading (or end of text), instead of
+    # re-scanning the tail once per competing pattern
+    matches = list(_ALL_SECTIONS_RE.finditer(text))
+    for i, match in enumerate(matches):
+        section_name = match.lastgroup
+        if section_name in sections:
+            # Repeat headings still bound the previous section above, but
+            # only the first occurrence of each section is kept
+            continue
+        next_start = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        section_text = text[match.start():next_start].strip()
+        if len(section_text) > 50:  # Only include substantial sections
+            sections[section_name] = section_text
+
+    if memo_key is not None:
+        _memo_set(_sections_memo, memo_key, sections)
     return sections
 
+# Counting matches via finditer streams over the document without
+# materializing a list of every word the way text.split() does
+_WORD_COUNT_RE = re.compile(r'\S+')
+
 def estimate_reading_time(text: str, words_per_minute: int = 250) -> int:
     """Estimate reading time in minutes"""
-    word_count = len(text.split())
+    word_count = sum(1 for _ in _WORD_COUNT_RE.finditer(text))
     return max(1, word_count // words_per_minute)
 
+# Common stop words excluded from keyword extraction; frozenset for
+# cheap membership tests in the counting loop
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
+    'we', 'they', 'he', 'she', 'it', 'our', 'their', 'his', 'her', 'its'
+})
+
+# {4,} bakes the old len(word) > 3 filter into the scan itself, so the
+# counting loop is left with a single set-membership test per word
+_WORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+_keywords_memo: 'OrderedDict[bytes, List[str]]' = OrderedDict()
+
 def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """Extract potential keywords from text (simple implementation)"""
-    # Remove common stop words
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-        'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
-        'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
-        'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
-        'we', 'they', 'he', 'she', 'it', 'our', 'their', 'his', 'her', 'its'
-    }
-    
-    # Extract words
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    
-    # Filter stop words and count frequency
-    word_freq = {}
-    for word in words:
-        if word not in stop_words and len(word) > 3:
-            word_freq[word] = word_freq.get(word, 0) + 1
-    
-    # Get most frequent words
-    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    return [word for word, freq in sorted_words[:max_keywords]]
+    memo_key = (_memo_key(text) + max_keywords.to_bytes(4, 'little')
+                if len(text) > _MEMO_MIN_CHARS else None)
+    if memo_key is not None:
+        cached = _memo_get(_keywords_memo, memo_key)
+        if cached is not None:
+            return list(cached)
+
+    # Counter does the tallying in C, and most_common runs a heap-based
+    # partial sort instead of ordering every unique word
+    counts = Counter(
+        word for word in _WORD_RE.findall(text.lower())
+        if word not in _STOP_WORDS
+    )
+    keywords = [word for word, _ in counts.most_common(max_keywords)]
+
+    if memo_key is not None:
+        _memo_set(_keywords_memo, memo_key, keywords)
+    return keywords
 
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format"""
     if size_bytes == 0:
         return "0 B"
-    
-    size_names = ["B", "KB", "MB", "GB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024
-        i += 1
-    
-    return f"{size_bytes:.1f} {size_names[i]}"
+
+    # The unit index falls straight out of the bit length (each unit step
+    # is 10 bits), replacing the divide-until-small loop with one division
+    size_names = ("B", "KB", "MB", "GB")
+    i = min(3, (size_bytes.bit_length() - 1) // 10)
+    return f"{size_bytes / (1 << (10 * i)):.1f} {size_names[i]}"
+
+# Mirrors the formats AnalysisFormatter can dispatch to
+_VALID_FORMATS = frozenset({'text', 'markdown', 'json'})
 
 def validate_output_format(output_format: str) -> bool:
     """Validate output format"""
-    valid_formats = ['text', 'markdown', 'json']
-    return output_format.lower() in valid_formats
+    return output_format.lower() in _VALID_FORMATS
 
 def get_file_extension_from_format(output_format: str) -> str:
     """Get appropriate file extension for output format"""
@@ -141,22 +205,33 @@ class ProgressTracker:
         self.current_step = 0
         self.description = description
         self.start_time = datetime.now()
-    
+        # Emit at most ~20 updates per second; per-step terminal writes
+        # dominate runtime when the steps themselves are cheap
+        self._last_emit = 0.0
+        self._min_interval = 0.05
+
     def update(self, step_description: Optional[str] = None):
         """Update progress"""
         self.current_step += 1
+
+        now = time.monotonic()
+        if (now - self._last_emit < self._min_interval
+                and self.current_step < self.total_steps):
+            return
+        self._last_emit = now
+
         progress = (self.current_step / self.total_steps) * 100
-        
-        elapsed = datetime.now() - self.start_time
-        
+
         status = f"{self.description}: {progress:.1f}% ({self.current_step}/{self.total_steps})"
         if step_description:
             status += f" - {step_description}"
-        
-        print(f"\r{status}", end="", flush=True)
-        
+
+        sys.stdout.write(f"\r{status}")
+
         if self.current_step >= self.total_steps:
-            print(f"\nCompleted in {elapsed.total_seconds():.1f} seconds")
+            elapsed = datetime.now() - self.start_time
+            sys.stdout.write(f"\nCompleted in {elapsed.total_seconds():.1f} seconds\n")
+        sys.stdout.flush()
     
     def finish(self):
         """Mark as finished"""
@@ -0,0 +1,47 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from utils import cache_key
+
+class ResponseCache:
+    """Persistent on-disk cache for LLM responses.
+
+    Re-running the same PDF (or the same excerpt through the prompt
+    tester) re-issues identical (system, user, model, temperature) calls;
+    caching exact matches makes repeat runs free.
+    """
+
+    def __init__(self, cache_dir: str = ".llm_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(system_prompt: str, prompt: str, model: str,
+                 temperature: float, max_tokens: int) -> str:
+        """Build a stable cache key for one completion request"""
+        payload = json.dumps(
+            [system_prompt, prompt, model, temperature, max_tokens],
+            sort_keys=True
+        )
+        return cache_key(payload)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on miss"""
+        try:
+            with open(self.cache_dir / f"{key}.json", 'r', encoding='utf-8') as f:
+                return json.load(f)['response']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, response: str):
+        """Store a response; failures are ignored so caching stays best-effort"""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = self.cache_dir / f"{key}.json.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'response': response}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
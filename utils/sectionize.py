@@ -0,0 +1,68 @@
+import re
+from typing import Dict, Optional
+
+# Section headings at line starts, optionally preceded by "1." style numbering;
+# one linear finditer sweep yields every boundary at once
+SECTION_RE = re.compile(
+    r'^\s*(?:\d+\.?\s*)?'
+    r'(abstract|introduction|methods?|methodology|results?|discussion|'
+    r'conclusions?|limitations?|future work)\b',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Normalize heading variants onto canonical section names
+_CANONICAL = {
+    'abstract': 'abstract',
+    'introduction': 'introduction',
+    'method': 'methodology',
+    'methods': 'methodology',
+    'methodology': 'methodology',
+    'result': 'results',
+    'results': 'results',
+    'discussion': 'discussion',
+    'conclusion': 'conclusion',
+    'conclusions': 'conclusion',
+    'limitation': 'limitations',
+    'limitations': 'limitations',
+    'future work': 'future_work'
+}
+
+# Which sections feed each analysis task
+TASK_SECTIONS = {
+    'summary': ('abstract', 'introduction'),
+    'key_findings': ('results', 'discussion'),
+    'methodology': ('methodology',),
+    'contributions': ('abstract', 'conclusion'),
+    'limitations': ('conclusion', 'limitations', 'future_work')
+}
+
+# Sections shorter than this are heading noise, not content
+MIN_SECTION_LENGTH = 50
+
+def sectionize(text: str) -> Dict[str, str]:
+    """Split paper text into sections keyed by canonical heading name.
+
+    All headings are found in one pass; each section runs from its heading
+    to the start of the next one, so no re-scanning is needed to find
+    section ends. Only the first occurrence of each section is kept.
+    """
+    matches = list(SECTION_RE.finditer(text))
+    sections = {}
+
+    for i, match in enumerate(matches):
+        name = _CANONICAL.get(match.group(1).lower())
+        if name is None or name in sections:
+            continue
+
+        start = match.start()
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        section_text = text[start:end].strip()
+        if len(section_text) > MIN_SECTION_LENGTH:
+            sections[name] = section_text
+
+    return sections
+
+def task_section_text(sections: Dict[str, str], task: str) -> Optional[str]:
+    """Join the sections relevant to a task, or None if none were found"""
+    parts = [sections[name] for name in TASK_SECTIONS.get(task, ()) if name in sections]
+    return "\n\n".join(parts) if parts else None